@@ -37,8 +37,8 @@ import threading
 import time
 import requests
 
-from PIL import ImageOps, ImageEnhance
 from ntfy_printer import config
+from ntfy_printer.helpers import to_monochrome
 from ntfy_printer.printer import WhiteboardPrinter
 from ntfy_printer.listener import listen
 
@@ -188,6 +188,7 @@ def main():
         if message:
             wp = WhiteboardPrinter(preview_mode=True)
             wp.print_msg(message)
+            wp.flush()
         sys.exit(0)
     
     if args.calibrate:
@@ -228,24 +229,10 @@ def main():
             img = wp.create_calibration_grid()
             
             try:
-                img_mono = img.convert("L")
-                img_mono = ImageOps.autocontrast(img_mono)
-                img_mono = ImageEnhance.Contrast(img_mono).enhance(config.IMAGE_CONTRAST)
-                img_mono = img_mono.convert("1")
+                img_mono = to_monochrome(img, dither=True)
                 
-                if wp.p:
-                    if config.IMAGE_IMPLS:
-                        impls = [i.strip() for i in config.IMAGE_IMPLS.split(',') if i.strip()]
-                    else:
-                        impls = [config.IMAGE_IMPL]
-                    
-                    for impl in impls:
-                        try:
-                            wp.p.image(img_mono, impl=impl)
-                            break
-                        except TypeError:
-                            wp.p.image(img_mono)
-                            break
+                if wp.p and not wp.print_image(img_mono):
+                    raise RuntimeError("All image implementations failed")
             except Exception as e:
                 if attempt < max_retries - 1:
                     logging.warning(f"Calibration attempt {attempt + 1} failed: {e}, retrying...")
@@ -276,23 +263,11 @@ def main():
         wp = WhiteboardPrinter()
         img = wp.create_alignment_test()
         wp.print_msg("ALIGNMENT TEST")
+        wp.flush()
         try:
-            img_mono = img.convert("L")
-            img_mono = ImageOps.autocontrast(img_mono)
-            img_mono = ImageEnhance.Contrast(img_mono).enhance(config.IMAGE_CONTRAST)
-            img_mono = img_mono.convert("1")
-            if wp.p:
-                if config.IMAGE_IMPLS:
-                    impls = [i.strip() for i in config.IMAGE_IMPLS.split(',') if i.strip()]
-                else:
-                    impls = [config.IMAGE_IMPL]
-                for impl in impls:
-                    try:
-                        wp.p.image(img_mono, impl=impl)
-                        break
-                    except TypeError:
-                        wp.p.image(img_mono)
-                        break
+            img_mono = to_monochrome(img, dither=True)
+            if wp.p and not wp.print_image(img_mono):
+                logging.error("All image implementations failed. Try IMAGE_IMPLS=bitImageColumn,bitImageRaster,graphics,raster")
         finally:
             if wp.p:
                 wp.p.text("\n\n\n\n")
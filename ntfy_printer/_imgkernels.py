@@ -0,0 +1,94 @@
+"""Optional Numba kernels for the monochrome conversion in helpers.to_monochrome.
+
+Numba is not a hard dependency (it is slow to install on ARM boards). When it
+is missing, NUMBA_AVAILABLE is False and callers use the numpy path instead.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+NUMBA_AVAILABLE = njit is not None
+
+
+def _gray_stats(gray):
+    """Min, max and sum of a grayscale image in one pass.
+
+    Returns:
+        tuple: (lo, hi, total) as ints
+    """
+    lo = 255
+    hi = 0
+    total = 0
+    height, width = gray.shape
+    for y in range(height):
+        for x in range(width):
+            v = gray[y, x]
+            if v < lo:
+                lo = v
+            if v > hi:
+                hi = v
+            total += v
+    return lo, hi, total
+
+
+def _gray_to_bits(gray, light_lut, scale, out_bits):
+    """Threshold, upscale and pack a grayscale image in one pass.
+
+    Args:
+        gray (np.ndarray): HxW uint8 grayscale pixels
+        light_lut (np.ndarray): 256 bools, True where a gray level prints
+            white after autocontrast and IMAGE_CONTRAST
+        scale (int): Integer nearest-neighbour upscale factor
+        out_bits (np.ndarray): (H*scale)x((W*scale+7)//8) uint8 output,
+            MSB first, 1 = white
+    """
+    height, width = gray.shape
+    if scale == 1:
+        # Common case (IMAGE_SCALE capped to paper width): pack straight from
+        # the source row, without the staging row and per-pixel division
+        full_bytes = width // 8
+        for y in range(height):
+            for bx in range(full_bytes):
+                byte = 0
+                for bit in range(8):
+                    if light_lut[gray[y, bx * 8 + bit]]:
+                        byte |= 0x80 >> bit
+                out_bits[y, bx] = byte
+            if full_bytes < out_bits.shape[1]:
+                byte = 0
+                for bit in range(width - full_bytes * 8):
+                    if light_lut[gray[y, full_bytes * 8 + bit]]:
+                        byte |= 0x80 >> bit
+                out_bits[y, full_bytes] = byte
+        return
+    
+    out_width = width * scale
+    light = np.empty(width, dtype=np.bool_)
+    for y in range(height):
+        for x in range(width):
+            light[x] = light_lut[gray[y, x]]
+        oy = y * scale
+        for bx in range(out_bits.shape[1]):
+            byte = 0
+            for bit in range(8):
+                ox = bx * 8 + bit
+                if ox < out_width and light[ox // scale]:
+                    byte |= 0x80 >> bit
+            out_bits[oy, bx] = byte
+        # Remaining output rows of this source row are identical
+        for r in range(1, scale):
+            out_bits[oy + r, :] = out_bits[oy, :]
+
+
+if NUMBA_AVAILABLE:
+    # Serial on purpose: receipts are ~640px wide, and a parallel thread pool
+    # started from the print worker thread hangs interpreter shutdown.
+    gray_stats = njit(cache=True)(_gray_stats)
+    gray_to_bits = njit(cache=True)(_gray_to_bits)
+else:
+    gray_stats = None
+    gray_to_bits = None
@@ -13,6 +13,7 @@ load_dotenv()
 DEFAULT_NTFY_HOST = os.environ.get("NTFY_HOST")
 DEFAULT_NTFY_TOPIC = os.environ.get("NTFY_TOPIC")
 ERROR_NTFY_TOPIC = os.environ.get("ERROR_NTFY_TOPIC")
+NTFY_READ_TIMEOUT = int(os.environ.get("NTFY_READ_TIMEOUT", "90"))  # seconds without data before reconnecting
 
 # --- Phone Number QR Code Configuration ---
 COUNTRY_CODE = os.environ.get("COUNTRY_CODE", "1")  # Default: US +1
@@ -1,14 +1,43 @@
-"""Helper functions for priority detection and emoji handling."""
+"""Helper functions for priority detection, emoji handling, and image conversion."""
 
+import math
 import re
+import numpy as np
+from PIL import Image
 from . import config
+from . import _imgkernels
+
+
+# Mapped emoji (group 1) or any other single emoji character, matched in one
+# pass. Mapped sequences are tried longest first so a multi-codepoint entry
+# (e.g. with a U+FE0F variation selector) wins over a shorter prefix entry.
+# The fallback class matches one character at a time so a run of unmapped
+# emoji cannot swallow a mapped one that follows it.
+_EMOJI_RE = re.compile(
+    "(" + "|".join(re.escape(emoji) for emoji in sorted(config.EMOJI_MAP, key=len, reverse=True)) + ")|"
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "\U00002702-\U000027B0"  # dingbats
+    "\U000024C2-\U0001F251"
+    "\U0001F900-\U0001F9FF"  # supplemental symbols
+    "\U0001FA00-\U0001FA6F"  # extended symbols
+    "]", flags=re.UNICODE
+)
+
+
+def _emoji_replacement(match):
+    emoji = match.group(1)
+    return config.EMOJI_MAP[emoji] if emoji else ""
 
 
 def strip_emojis(text):
     """Remove or replace emojis with ASCII alternatives for thermal printer.
     
-    Replaces specific emoji with text alternatives first, then removes
-    any remaining emoji characters.
+    Replaces specific emoji with text alternatives and removes any other
+    emoji characters in a single regex pass.
     
     Args:
         text (str): Text potentially containing emoji
@@ -16,25 +45,83 @@ def strip_emojis(text):
     Returns:
         str: Text with emoji removed or replaced
     """
-    # First try specific mappings
-    for emoji, replacement in config.EMOJI_MAP.items():
-        text = text.replace(emoji, replacement)
-    
-    # Remove any remaining emojis (Unicode ranges for common emoji blocks)
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        "\U00002702-\U000027B0"  # dingbats
-        "\U000024C2-\U0001F251"
-        "\U0001F900-\U0001F9FF"  # supplemental symbols
-        "\U0001FA00-\U0001FA6F"  # extended symbols
-        "]+", flags=re.UNICODE
-    )
-    text = emoji_pattern.sub('', text)
-    return text
+    # Most messages are plain ASCII, which cannot contain emoji; isascii() is a
+    # single C-level check, far cheaper than running the regex over the text
+    if text.isascii():
+        return text
+    return _EMOJI_RE.sub(_emoji_replacement, text)
+
+
+def pixel_wrap(text, font, max_width, char_width=None, max_lines=None):
+    """Wrap text into lines no wider than max_width pixels in the given font.
+    
+    Each line starts from a character-count estimate based on the width of
+    "a", then grows or shrinks a word at a time, so font.getlength() runs a
+    few times per line instead of once per character. Whitespace is collapsed
+    like textwrap, and words wider than a whole line are split.
+    
+    Args:
+        text (str): Text to wrap
+        font: PIL font used for measuring
+        max_width (int): Maximum line width in pixels
+        char_width (float): Cached advance of "a" in this font (measured if None)
+        max_lines (int): Stop after this many lines (default: no limit)
+        
+    Returns:
+        list: Wrapped lines (empty for blank text)
+    """
+    words = text.split()
+    if char_width is None:
+        char_width = font.getlength("a")
+    estimate = max(1, int(max_width // max(1, char_width)))
+    
+    # Short notifications fit on one line: one measurement and no word loop
+    if words and len(text) <= estimate and (max_lines is None or max_lines > 0):
+        line = " ".join(words)
+        if font.getlength(line) <= max_width:
+            return [line]
+    
+    lines = []
+    i = 0
+    while i < len(words) and (max_lines is None or len(lines) < max_lines):
+        # Seed the line with as many words as the estimate allows
+        n = i + 1
+        chars = len(words[i])
+        while n < len(words) and chars + 1 + len(words[n]) <= estimate:
+            chars += 1 + len(words[n])
+            n += 1
+        line = " ".join(words[i:n])
+        
+        if font.getlength(line) <= max_width:
+            # Extend while the next word still fits
+            while n < len(words):
+                candidate = line + " " + words[n]
+                if font.getlength(candidate) > max_width:
+                    break
+                line = candidate
+                n += 1
+        else:
+            # Trim words until the line fits
+            while n - i > 1:
+                n -= 1
+                line = " ".join(words[i:n])
+                if font.getlength(line) <= max_width:
+                    break
+        
+        # A single word wider than the line is split at the widest fitting prefix
+        if n == i + 1 and len(line) > 1 and font.getlength(line) > max_width:
+            cut = max(1, min(len(line) - 1, estimate))
+            while cut > 1 and font.getlength(line[:cut]) > max_width:
+                cut -= 1
+            while cut < len(line) - 1 and font.getlength(line[:cut + 1]) <= max_width:
+                cut += 1
+            lines.append(line[:cut])
+            words[i] = line[cut:]
+            continue
+        
+        lines.append(line)
+        i = n
+    return lines
 
 
 def detect_priority(message, payload=None):
@@ -182,3 +269,122 @@ def draw_priority_banner(draw, x, y, width, height, priority, font, text_color=(
     draw.text((text_x, text_y), banner_text, font=font, fill=(0, 0, 0))
     
     return banner_text
+
+
+def to_monochrome(img, scale=1, dither=False):
+    """Convert a rendered receipt image to 1-bit for the thermal printer.
+    
+    Stretches the grayscale range to 0-255 (autocontrast), applies
+    IMAGE_CONTRAST around the mean like ImageEnhance.Contrast, then
+    thresholds and bit-packs - all on one numpy array instead of a chain of
+    intermediate Pillow images. Uses the fused Numba kernel when available.
+    
+    With `dither`, the same stretch and contrast are applied as a LUT and the
+    result is Floyd-Steinberg dithered instead, for renders with shaded fills
+    (priority banners, the calibration grid) that must print as tone rather
+    than collapse to solid black or white. Text layouts keep the threshold;
+    any emoji in them are dithered before they are pasted in.
+    
+    An integer `scale` gives the same result as a NEAREST resize beforehand:
+    the range and mean are unchanged by pixel replication, so statistics are
+    taken at source size and pixels are only replicated when writing bits.
+    
+    Mode "1" input skips the grayscale work entirely (and is returned as-is
+    at scale 1) since thresholding cannot change it.
+    
+    Args:
+        img (PIL.Image): Rendered image (any mode)
+        scale (int): Integer upscale factor applied to the output (default 1)
+        dither (bool): Error-diffuse instead of thresholding (default False)
+        
+    Returns:
+        PIL.Image: Mode "1" image ready for ESC/POS output
+    """
+    out_size = (img.width * scale, img.height * scale)
+    
+    if img.mode == "1" and config.IMAGE_CONTRAST >= 1 and not dither:
+        # Already 1-bit: the stretch and a contrast gain >= 1 map black and
+        # white to themselves, so only the upscale is left
+        if scale == 1:
+            return img
+        bits = np.packbits(_upscale_mask(np.asarray(img), scale), axis=1)
+        return Image.frombytes("1", out_size, bits.tobytes())
+    
+    # convert() always copies, even L -> L
+    gray = img if img.mode == "L" else img.convert("L")
+    arr = np.asarray(gray)
+    
+    if dither:
+        toned = gray.point(_tone_lut(arr))
+        if scale > 1:
+            # Dither at print size, as the printer sees it
+            toned = toned.resize(out_size, Image.NEAREST)
+        return toned.convert("1")
+    
+    # Range and mean from one pass when Numba is available (numpy needs three);
+    # both paths take the mean from an exact integer sum so they agree
+    if _imgkernels.NUMBA_AVAILABLE:
+        lo, hi, total = _imgkernels.gray_stats(arr)
+    else:
+        lo, hi, total = arr.min(), arr.max(), arr.sum(dtype=np.uint64)
+    lo, hi = float(lo), float(hi)
+    if hi > lo:
+        gain = 255.0 / (hi - lo)
+    else:
+        # Uniform image: autocontrast leaves it unchanged
+        lo, gain = 0.0, 1.0
+    mean = (int(total) / arr.size - lo) * gain
+    
+    # Mode "1" stores set bits as white, so pack the pixels that stay light
+    if _imgkernels.NUMBA_AVAILABLE:
+        # Decide light/dark once per gray level, so the kernel only does lookups
+        levels = np.arange(256, dtype=np.float64)
+        light_lut = mean + ((levels - lo) * gain - mean) * config.IMAGE_CONTRAST >= 128
+        bits = np.empty((out_size[1], (out_size[0] + 7) // 8), dtype=np.uint8)
+        _imgkernels.gray_to_bits(arr, light_lut, scale, bits)
+    else:
+        # mean + ((g - lo) * gain - mean) * contrast >= 128 is linear in g, so
+        # it reduces to one integer cutoff on the raw gray values
+        slope = gain * config.IMAGE_CONTRAST
+        rhs = 128 - mean * (1 - config.IMAGE_CONTRAST)
+        if slope > 0:
+            light = arr >= min(256, max(0, math.ceil(lo + rhs / slope)))
+        elif slope < 0:
+            light = arr <= min(255, max(-1, math.floor(lo + rhs / slope)))
+        else:
+            light = np.full(arr.shape, rhs <= 0)
+        bits = np.packbits(_upscale_mask(light, scale), axis=1)
+    return Image.frombytes("1", out_size, bits.tobytes())
+
+
+def _tone_lut(arr):
+    """ImageOps.autocontrast followed by ImageEnhance.Contrast as one 256-entry LUT.
+    
+    Follows Pillow's own formulas (and uses Image.blend for the contrast
+    step), so applying it with Image.point gives the same grays as running
+    both enhancers over the full image, in a single pass.
+    """
+    hist = np.bincount(arr.ravel(), minlength=256)
+    levels = np.flatnonzero(hist)
+    lo, hi = int(levels[0]), int(levels[-1])
+    if hi > lo:
+        gain = 255.0 / (hi - lo)
+        offset = -lo * gain
+        stretch = [min(255, max(0, int(ix * gain + offset))) for ix in range(256)]
+    else:
+        stretch = list(range(256))
+    mean = int(float(np.dot(hist, stretch)) / arr.size + 0.5)
+    ramp = Image.frombytes("L", (256, 1), bytes(stretch))
+    return list(Image.blend(Image.new("L", (256, 1), mean), ramp, config.IMAGE_CONTRAST).tobytes())
+
+
+def _upscale_mask(mask, scale):
+    """Nearest-neighbour upscale a 2D array by an integer factor.
+    
+    Makes one copy via a broadcast view instead of two np.repeat passes, and
+    returns the input untouched when scale is 1.
+    """
+    if scale == 1:
+        return mask
+    h, w = mask.shape
+    return np.broadcast_to(mask[:, None, :, None], (h, scale, w, scale)).reshape(h * scale, w * scale)
@@ -5,22 +5,47 @@ import time
 import json
 import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
 
 try:
     import psutil
 except ImportError:
     psutil = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from . import config
 from .printer import WhiteboardPrinter
 from .updater import UpdateChecker
 
 
+# Seconds to wait for queued receipts to finish printing on shutdown
+_SHUTDOWN_FLUSH_TIMEOUT = 30
+
+# Parses the raw bytes of each stream line (orjson when installed, it is
+# several times faster than the stdlib on small event objects)
+_parse_event = orjson.loads if orjson else json.loads
+
 # Global monitor and update checker instances
 MONITOR = None
 UPDATE_CHECKER = None
 
 
+def _is_read_timeout(exc):
+    """True if exc is the stream going quiet for longer than NTFY_READ_TIMEOUT.
+    
+    Before the response headers requests raises ReadTimeout; once iter_lines()
+    is streaming the same urllib3 timeout arrives wrapped in a ConnectionError.
+    """
+    if isinstance(exc, requests.exceptions.ReadTimeout):
+        return True
+    return isinstance(exc, requests.exceptions.ConnectionError) and bool(exc.args) and isinstance(exc.args[0], ReadTimeoutError)
+
+
 def _send_error_notification(ntfy_url, title, message):
     """Send error notification to ntfy topic using native format."""
     if not ntfy_url:
@@ -49,7 +74,12 @@ def listen(ntfy_url, preview_mode=False, error_notifier=None, server_mode=False)
         server_mode (bool): If True, running as systemd service
     """
     global MONITOR, UPDATE_CHECKER
-    wp = WhiteboardPrinter(preview_mode=preview_mode)
+    
+    def on_print_error(e):
+        if error_notifier:
+            _send_error_notification(error_notifier, "Printer Error", f"Failed to print message: {str(e)}")
+    
+    wp = WhiteboardPrinter(preview_mode=preview_mode, on_error=on_print_error)
     
     mode_str = "preview mode" if preview_mode else "printer mode"
     if not server_mode:
@@ -75,36 +105,59 @@ def listen(ntfy_url, preview_mode=False, error_notifier=None, server_mode=False)
         )
         UPDATE_CHECKER.start()
     
-    while not config.STOP_EVENT.is_set():
-        try:
-            with requests.get(ntfy_url, stream=True, timeout=None) as r:
-                r.raise_for_status()
-                for line in r.iter_lines(decode_unicode=True):
-                    if config.STOP_EVENT.is_set():
-                        break
-                    if line:
-                        try:
-                            payload = json.loads(line)
-                        except Exception:
-                            logging.warning("Received non-json line: %s", line)
-                            continue
-                        msg = payload.get("message", "")
-                        if msg:
-                            if len(msg) > config.MAX_MESSAGE_LENGTH:
-                                msg = msg[:config.MAX_MESSAGE_LENGTH-3] + "..."
+    # One keep-alive session for the stream, so reconnects after a dropped
+    # connection can reuse the pooled socket/TLS session instead of starting over
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    
+    try:
+        while not config.STOP_EVENT.is_set():
+            try:
+                # ntfy sends a keepalive event every 45s by default, so the default
+                # read timeout of twice that only fires on a dead (half-open) connection
+                with session.get(ntfy_url, stream=True, timeout=(5, config.NTFY_READ_TIMEOUT)) as r:
+                    r.raise_for_status()
+                    for line in r.iter_lines():
+                        if config.STOP_EVENT.is_set():
+                            break
+                        # Keepalive/open events carry no "message" key; a substring
+                        # check rejects them without parsing the line
+                        if line and b'"message"' in line:
                             try:
-                                wp.print_msg(msg, payload=payload)
-                            except Exception as e:
-                                logging.error("Error printing message: %s", e, exc_info=True)
-                                if error_notifier:
-                                    _send_error_notification(error_notifier, "Printer Error", f"Failed to print message: {str(e)}")
-        except Exception as e:
-            if config.STOP_EVENT.is_set():
-                break
-            logging.exception("Connection to ntfy failed — retrying in 5s")
-            if error_notifier:
-                _send_error_notification(error_notifier, "Connection Error", f"Failed to connect to ntfy: {str(e)}")
-            time.sleep(5)
+                                payload = _parse_event(line)
+                            except Exception:
+                                logging.warning("Received non-json line: %s", line)
+                                continue
+                            msg = payload.get("message", "")
+                            if msg:
+                                if len(msg) > config.MAX_MESSAGE_LENGTH:
+                                    msg = msg[:config.MAX_MESSAGE_LENGTH-3] + "..."
+                                try:
+                                    wp.print_msg(msg, payload=payload)
+                                except Exception as e:
+                                    logging.error("Error printing message: %s", e, exc_info=True)
+                                    if error_notifier:
+                                        _send_error_notification(error_notifier, "Printer Error", f"Failed to print message: {str(e)}")
+            except Exception as e:
+                if config.STOP_EVENT.is_set():
+                    break
+                if _is_read_timeout(e):
+                    # A silent stream is reconnected straight away; it is not worth an alert
+                    logging.warning("No data from ntfy for %ss — reconnecting", config.NTFY_READ_TIMEOUT)
+                    continue
+                logging.exception("Connection to ntfy failed — retrying in 5s")
+                if error_notifier:
+                    _send_error_notification(error_notifier, "Connection Error", f"Failed to connect to ntfy: {str(e)}")
+                time.sleep(5)
+    finally:
+        session.close()
+        # Finish what is already queued (a SIGTERM exit, "Q" or an update
+        # restart would otherwise kill the daemon print worker mid-receipt),
+        # but don't let a hung USB write block shutdown forever
+        if not wp.flush(timeout=_SHUTDOWN_FLUSH_TIMEOUT):
+            logging.warning("Print queue not drained after %ss — exiting anyway", _SHUTDOWN_FLUSH_TIMEOUT)
     
     # Stop monitor and update checker on exit
     try:
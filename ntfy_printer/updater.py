@@ -3,16 +3,38 @@
 Checks GitHub for new releases and performs git-based updates.
 """
 
+import json
 import logging
+import re
 import subprocess
-import time
 import threading
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
 from . import config
 
 
+# Top-level "tag_name" in a release payload. Quotes inside string values are
+# escaped, so text in the release notes cannot match.
+_TAG_NAME_RE = re.compile(rb'"tag_name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _release_tag(content):
+    """Extract tag_name from a GitHub release JSON body without parsing all of it.
+    
+    Args:
+        content (bytes): Raw response body
+        
+    Returns:
+        str: Tag name, or "" if the payload has none
+    """
+    match = _TAG_NAME_RE.search(content)
+    if match:
+        return json.loads(b'"' + match.group(1) + b'"')
+    return json.loads(content).get("tag_name", "")
+
+
 class UpdateChecker(threading.Thread):
     """Background thread that checks for updates and optionally auto-updates.
     
@@ -25,6 +47,11 @@ class UpdateChecker(threading.Thread):
         error_notifier (str): Optional ntfy URL for error notifications
     """
     
+    # While a repo has no releases, go back to releases/latest after this many
+    # tag-only checks even if the tag list has not changed (about a day at the
+    # default hourly interval)
+    _RELEASE_REPROBE_CHECKS = 24
+    
     def __init__(self, interval=None, server_mode=False, error_notifier=None):
         super().__init__(daemon=True, name="UpdateChecker")
         self.interval = interval or config.UPDATE_CHECK_INTERVAL
@@ -33,6 +60,25 @@ class UpdateChecker(threading.Thread):
         self._stop_event = threading.Event()
         self.current_version = self._get_current_version()
         
+        # Keep-alive session so each check reuses the TLS connection to GitHub
+        # (and the ntfy error notifier) instead of handshaking every interval
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=2)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        
+        # ETag and parsed version of the last 200 response per endpoint, so
+        # unchanged data comes back as a bodiless 304 (not counted against the rate limit)
+        self._releases_etag = None
+        self._releases_version = None
+        self._tags_etag = None
+        self._tags_version = None
+        # Set when releases/latest 404s, so later checks only ask the (cheap, usually
+        # 304) tags endpoint. Cleared again when the tag list changes or after
+        # _RELEASE_REPROBE_CHECKS checks, since a release may have been published.
+        self._no_releases = False
+        self._checks_since_release_probe = 0
+        
     def run(self):
         """Main update checking loop."""
         if not config.AUTO_UPDATE:
@@ -42,10 +88,15 @@ class UpdateChecker(threading.Thread):
         logging.info(f"Update checker started (interval: {self.interval}s, repo: {config.GITHUB_REPO})")
         logging.info(f"Current version: {self.current_version or 'unknown'}")
         
+        # Wake our own stop event when the app-wide one is set, so the loop
+        # can block on a single Event instead of polling both every second
+        threading.Thread(target=self._mirror_app_stop, daemon=True, name="UpdateCheckerStop").start()
+        
         # Wait a bit before first check to let app fully start
-        time.sleep(60)
+        if self._stop_event.wait(60):
+            return
         
-        while not self._stop_event.is_set() and not config.STOP_EVENT.is_set():
+        while not self._stop_event.is_set():
             try:
                 self._check_for_updates()
             except Exception as e:
@@ -53,16 +104,18 @@ class UpdateChecker(threading.Thread):
                 if self.error_notifier:
                     self._send_error("Update Check Failed", str(e))
             
-            # Sleep in small intervals so we can exit quickly if needed
-            for _ in range(self.interval):
-                if self._stop_event.is_set() or config.STOP_EVENT.is_set():
-                    break
-                time.sleep(1)
+            if self._stop_event.wait(self.interval):
+                break
     
     def stop(self):
         """Stop the update checker."""
         self._stop_event.set()
     
+    def _mirror_app_stop(self):
+        """Block until config.STOP_EVENT is set, then stop this checker."""
+        config.STOP_EVENT.wait()
+        self._stop_event.set()
+    
     def _get_current_version(self):
         """Get current git version (tag or commit hash).
         
@@ -108,21 +161,43 @@ class UpdateChecker(threading.Thread):
         """Check GitHub for new releases."""
         logging.debug(f"Checking for updates from {config.GITHUB_REPO}...")
         
+        if self._no_releases:
+            self._checks_since_release_probe += 1
+            try:
+                tags_changed = self._refresh_tags()
+            except requests.RequestException as e:
+                logging.debug(f"Failed to check GitHub tags: {e}")
+                return
+            if not tags_changed and self._checks_since_release_probe < self._RELEASE_REPROBE_CHECKS:
+                self._apply_latest_tag()
+                return
+            # New tags (or a periodic re-check): releases/latest is authoritative
+            # when it exists, so probe it again before trusting the tags
+            logging.debug("Re-checking for GitHub releases...")
+            self._no_releases = False
+        
         # Try latest release first
         api_url = f"https://api.github.com/repos/{config.GITHUB_REPO}/releases/latest"
         
         try:
-            response = requests.get(api_url, timeout=10)
+            headers = {"If-None-Match": self._releases_etag} if self._releases_etag else {}
+            response = self._session.get(api_url, headers=headers, timeout=10)
             
             if response.status_code == 404:
                 # No releases yet, check tags instead
                 logging.debug("No releases found, checking tags...")
+                self._no_releases = True
+                self._checks_since_release_probe = 0
                 self._check_tags_for_updates()
                 return
             
-            response.raise_for_status()
-            latest_release = response.json()
-            latest_version = latest_release.get("tag_name", "").lstrip("v")
+            if response.status_code == 304:
+                latest_version = self._releases_version
+            else:
+                response.raise_for_status()
+                latest_version = _release_tag(response.content).lstrip("v")
+                self._releases_etag = response.headers.get("ETag")
+                self._releases_version = latest_version
             
             if not latest_version:
                 logging.warning("No release tag found on GitHub")
@@ -145,31 +220,47 @@ class UpdateChecker(threading.Thread):
     
     def _check_tags_for_updates(self):
         """Check GitHub tags as fallback when no releases exist."""
-        api_url = f"https://api.github.com/repos/{config.GITHUB_REPO}/tags"
-        
         try:
-            response = requests.get(api_url, timeout=10)
-            response.raise_for_status()
-            tags = response.json()
-            
-            if not tags:
-                logging.debug("No tags found on GitHub")
-                return
-            
-            # Get the latest tag
-            latest_tag = tags[0].get("name", "").lstrip("v")
-            current_version = (self.current_version or "").lstrip("v")
-            
-            if latest_tag and latest_tag != current_version:
-                logging.info(f"New tag available: {latest_tag} (current: {current_version})")
-                
-                if config.AUTO_UPDATE:
-                    self._perform_update(latest_tag)
-            else:
-                logging.debug(f"Already on latest tag: {latest_tag}")
-                
+            self._refresh_tags()
         except requests.RequestException as e:
             logging.debug(f"Failed to check GitHub tags: {e}")
+            return
+        self._apply_latest_tag()
+    
+    def _refresh_tags(self):
+        """Fetch the tag list if it changed since the last check (conditional GET).
+        
+        Returns:
+            bool: True if GitHub sent a new tag list, False on 304 Not Modified
+        """
+        api_url = f"https://api.github.com/repos/{config.GITHUB_REPO}/tags"
+        headers = {"If-None-Match": self._tags_etag} if self._tags_etag else {}
+        response = self._session.get(api_url, headers=headers, timeout=10)
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        tags = response.json()
+        
+        # Get the latest tag
+        self._tags_version = tags[0].get("name", "").lstrip("v") if tags else None
+        self._tags_etag = response.headers.get("ETag")
+        return True
+    
+    def _apply_latest_tag(self):
+        """Update if the last fetched tag differs from the current version."""
+        latest_tag = self._tags_version
+        if not latest_tag:
+            logging.debug("No tags found on GitHub")
+            return
+        current_version = (self.current_version or "").lstrip("v")
+        
+        if latest_tag != current_version:
+            logging.info(f"New tag available: {latest_tag} (current: {current_version})")
+            
+            if config.AUTO_UPDATE:
+                self._perform_update(latest_tag)
+        else:
+            logging.debug(f"Already on latest tag: {latest_tag}")
     
     def _perform_update(self, new_version):
         """Perform git pull and restart service.
@@ -182,16 +273,24 @@ class UpdateChecker(threading.Thread):
         try:
             repo_path = self._get_repo_path()
             
-            # Ensure we're on a clean state
+            # Ensure we're on a clean state: refresh stat info so touched-but-unchanged
+            # files don't count, then let diff-index answer with its exit code
+            subprocess.run(
+                ["git", "update-index", "-q", "--refresh"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=5,
+                cwd=repo_path
+            )
             result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                capture_output=True,
-                text=True,
+                ["git", "diff-index", "--quiet", "HEAD", "--"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=5,
                 cwd=repo_path
             )
             
-            if result.stdout.strip():
+            if result.returncode != 0:
                 logging.warning("Working directory has uncommitted changes - skipping update")
                 self._send_error("Update Skipped", "Working directory has uncommitted changes")
                 return
@@ -260,6 +359,6 @@ class UpdateChecker(threading.Thread):
                 "Tags": "rotating_light,error",
                 "Priority": "high"
             }
-            requests.post(self.error_notifier, data=message, headers=headers, timeout=5)
+            self._session.post(self.error_notifier, data=message, headers=headers, timeout=5)
         except Exception as e:
             logging.error(f"Failed to send error notification: {e}")
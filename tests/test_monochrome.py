@@ -0,0 +1,52 @@
+"""Emoji headers must survive the 1-bit conversion regardless of receipt content."""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+import pilmoji.source
+
+from ntfy_printer import config
+from ntfy_printer import printer
+from ntfy_printer.printer import WhiteboardPrinter
+
+
+def _orange_emoji(self, emoji):
+    # Stand-in for the emoji CDN: a solid #FFAC33 square (the ⚡ bolt's colour, L~183)
+    buf = io.BytesIO()
+    Image.new("RGBA", (72, 72), (0xFF, 0xAC, 0x33, 255)).save(buf, "PNG")
+    buf.seek(0)
+    return buf
+
+
+@pytest.fixture
+def wp(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(pilmoji.source.EmojiCDNSource, "get_emoji", _orange_emoji)
+    printer._priority_header_img.cache_clear()
+    printer._tag_header_img.cache_clear()
+    config.setup()
+    yield WhiteboardPrinter(preview_mode=True)
+    printer._priority_header_img.cache_clear()
+    printer._tag_header_img.cache_clear()
+
+
+def _header_black_pixels(wp, body, payload):
+    img = wp.create_layout(body, priority="max", payload=payload)
+    mono = wp._to_print_mono(img)
+    # Header sits above the first line of body text; the print scale is capped
+    # to the paper width, so take it from the output rather than IMAGE_SCALE
+    header_bottom = (wp._TOP_PAD + wp._HEADER_GAP) * (mono.height // img.height)
+    return int((np.asarray(mono.convert("L"))[:header_bottom] == 0).sum())
+
+
+@pytest.mark.parametrize("payload", [{"priority": 5}, {"tags": "warning,pizza"}], ids=["priority", "tags"])
+@pytest.mark.parametrize("body", ["Hi", "x" * 132], ids=["short", "long"])
+def test_emoji_header_prints_black_pixels(wp, body, payload):
+    assert _header_black_pixels(wp, body, payload) > 0
+
+
+@pytest.mark.parametrize("payload", [{"priority": 5}, {"tags": "warning,pizza"}], ids=["priority", "tags"])
+def test_emoji_header_independent_of_body_length(wp, payload):
+    assert _header_black_pixels(wp, "Hi", payload) == _header_black_pixels(wp, "x" * 132, payload)